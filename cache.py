@@ -0,0 +1,51 @@
+"""
+Cache Helper Functions
+
+Optional Redis cache for pre-serialized JSON responses.
+Caching is disabled when REDIS_URL is not set, and Redis errors are treated
+as cache misses so the API keeps working against MongoDB alone.
+"""
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+import os
+from dotenv import load_dotenv
+from typing import Optional
+
+# Load environment variables from .env file
+load_dotenv()
+
+redis_client = None
+
+redis_url = os.getenv("REDIS_URL")
+
+if redis_url:
+    # Short timeouts so a slow or unreachable Redis reads as a cache miss
+    redis_client = Redis.from_url(redis_url, socket_connect_timeout=0.25, socket_timeout=0.25)
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Return the cached bytes for key, or None on miss"""
+    if redis_client is None:
+        return None
+    try:
+        return await redis_client.get(key)
+    except RedisError:
+        return None
+
+async def cache_set(key: str, value: bytes, ttl: int):
+    """Store bytes under key for ttl seconds"""
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(key, value, ex=ttl)
+    except RedisError:
+        pass
+
+async def cache_incr(key: str):
+    """Atomically increment an integer counter stored under key"""
+    if redis_client is None:
+        return
+    try:
+        await redis_client.incr(key)
+    except RedisError:
+        pass
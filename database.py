@@ -5,7 +5,7 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
@@ -22,12 +22,28 @@ database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    # One client per process; pool sized for a single async worker. Connect
+    # lazily so the uvicorn supervisor, which imports this module but serves
+    # no requests, never opens a pool; workers connect in their startup hooks.
+    _client = AsyncIOMotorClient(
+        database_url,
+        connect=False,
+        maxPoolSize=20,
+        minPoolSize=2,
+        maxIdleTimeMS=60000,
+        maxConnecting=4,
+        connectTimeoutMS=5000,
+        socketTimeoutMS=10000,
+        serverSelectionTimeoutMS=3000,
+        retryWrites=True,
+        # Return stored datetimes as UTC-aware, matching what we insert
+        tz_aware=True,
+    )
     db = _client[database_name]
 
 # Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
-    """Insert a single document with timestamp"""
+async def create_document(collection_name: str, data: Union[BaseModel, dict], now: datetime = None):
+    """Insert a single document with timestamp (defaults to the current time)"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
@@ -37,19 +53,30 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     else:
         data_dict = data.copy()
 
-    data_dict['created_at'] = datetime.now(timezone.utc)
-    data_dict['updated_at'] = datetime.now(timezone.utc)
+    if now is None:
+        now = datetime.now(timezone.utc)
+    data_dict['created_at'] = now
+    data_dict['updated_at'] = now
 
-    result = db[collection_name].insert_one(data_dict)
+    result = await db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
-    """Get documents from collection"""
+def find_documents(collection_name: str, filter_dict: dict = None, limit: int = None,
+                   projection: dict = None, sort: list = None):
+    """Return a cursor over documents, optionally projected and sorted"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
-    cursor = db[collection_name].find(filter_dict or {})
+    cursor = db[collection_name].find(filter_dict or {}, projection)
+    if sort:
+        cursor = cursor.sort(sort)
     if limit:
-        cursor = cursor.limit(limit)
-    
-    return list(cursor)
+        # Fetch the whole page in a single batch
+        cursor = cursor.limit(limit).batch_size(limit)
+    return cursor
+
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None,
+                        projection: dict = None, sort: list = None):
+    """Get documents from collection, optionally projected and sorted"""
+    cursor = find_documents(collection_name, filter_dict, limit, projection, sort)
+    return await cursor.to_list(limit)
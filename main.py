@@ -1,30 +1,94 @@
 import os
-from fastapi import FastAPI, HTTPException
+import re
+import time
+import functools
+import asyncio
+import logging
+import orjson
+import msgspec
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from typing import List
 from bson import ObjectId
 from datetime import datetime, timezone
+from urllib.parse import urlsplit
 
-from database import db, create_document, get_documents
-from schemas import VideoJob, VideoJobOut, ClipRequest, ClipResult, DetectedMoment
+from database import db, create_document, find_documents
+from cache import redis_client, cache_get, cache_set, cache_incr
+from schemas import VideoJob, VideoJobOut, ClipRequest, ClipResult, ClipResultOut, OverlayTextOut, DetectedMoment
 
-app = FastAPI(title="AI Clipper Backend", description="Analyze YouTube links, find key moments, and generate clip overlays.")
+# Cache lifetimes in seconds; single jobs don't change once analyzed
+JOB_CACHE_TTL = 600
+JOB_LIST_CACHE_TTL = 30
+# Bumped on every new job; list keys embed it, so stale pages just expire
+JOB_LIST_VERSION_KEY = "jobs:list:version"
+
+# /test diagnostics: bound the Mongo call and reuse its result briefly
+DB_CHECK_TIMEOUT = 1.0
+DB_CHECK_TTL = 10.0
+
+app = FastAPI(
+    title="AI Clipper Backend",
+    description="Analyze YouTube links, find key moments, and generate clip overlays.",
+    default_response_class=ORJSONResponse,
+)
+
+# Comma-separated list of frontend origins allowed to call the API
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
+    if origin.strip()
+]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["authorization", "content-type"],
 )
 
+_db_check = {"at": 0.0, "collections": None}
+
+async def _list_collections() -> List[str]:
+    """Collection names, cached for DB_CHECK_TTL seconds"""
+    now = time.monotonic()
+    if _db_check["collections"] is not None and now - _db_check["at"] < DB_CHECK_TTL:
+        return _db_check["collections"]
+    collections = await asyncio.wait_for(db.list_collection_names(), timeout=DB_CHECK_TIMEOUT)
+    _db_check["at"] = now
+    _db_check["collections"] = collections
+    return collections
+
+@app.on_event("startup")
+async def _warm_db_check():
+    if db is None:
+        return
+    try:
+        await _list_collections()
+    except Exception:
+        # /test reports the failure when it is actually polled
+        pass
+
+@app.on_event("startup")
+async def _ensure_indexes():
+    if db is None:
+        return
+    try:
+        await db["videojob"].create_index([("created_at", -1)])
+        await db["videojob"].create_index("status")
+    except Exception as e:
+        logging.getLogger(__name__).warning("Could not create videojob indexes: %s", e)
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "AI Clipper Backend Running"}
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -39,10 +103,12 @@ def test_database():
             response["database_url"] = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
             response["database_name"] = "✅ Set" if os.getenv("DATABASE_NAME") else "❌ Not Set"
             try:
-                collections = db.list_collection_names()
+                collections = await _list_collections()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
                 response["connection_status"] = "Connected"
+            except asyncio.TimeoutError:
+                response["database"] = f"⚠️ Connected but Error: no response within {DB_CHECK_TIMEOUT}s"
             except Exception as e:
                 response["database"] = f"⚠️ Connected but Error: {str(e)[:80]}"
         else:
@@ -55,93 +121,196 @@ def test_database():
 class AnalyzeRequest(BaseModel):
     youtube_url: str
 
+_YT_HOSTS = frozenset({
+    "youtube.com",
+    "www.youtube.com",
+    "m.youtube.com",
+    "music.youtube.com",
+    "youtu.be",
+})
+
+# Same length cap HttpUrl enforces
+_MAX_URL_LENGTH = 2083
+_URL_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
+
+# Heuristic demo moments; identical for every job and never mutated
+_DEMO_MOMENTS = [
+    DetectedMoment.model_construct(start_sec=5.0, end_sec=12.0, label="Intro punch", confidence=0.91),
+    DetectedMoment.model_construct(start_sec=35.0, end_sec=48.0, label="Key point", confidence=0.88),
+    DetectedMoment.model_construct(start_sec=120.0, end_sec=136.0, label="Best moment", confidence=0.93),
+]
+_DEMO_MOMENTS_DUMP = [m.model_dump() for m in _DEMO_MOMENTS]
+
 @app.post("/api/analyze", response_model=VideoJobOut)
-def analyze_youtube(req: AnalyzeRequest):
+async def analyze_youtube(req: AnalyzeRequest):
     """Simulate analysis of a YouTube link and store a job in DB.
     In a real system, you would fetch transcript/audio, run ML to detect highlights.
     Here, we'll create heuristic moments and save.
     """
-    if not req.youtube_url or "youtube" not in req.youtube_url:
+    # VideoJob is built without validation below, so this is the only URL check.
+    # urlsplit silently drops surrounding whitespace and tabs/newlines, but
+    # the raw string is what gets stored, so reject those outright.
+    url = req.youtube_url
+    if len(url) > _MAX_URL_LENGTH or url != url.strip() or _URL_CONTROL_CHARS.search(url):
+        raise HTTPException(status_code=400, detail="URL harus berupa link YouTube yang valid")
+    try:
+        parts = urlsplit(url)
+        parts.port  # raises ValueError when out of range or not numeric
+    except ValueError:
+        parts = None
+    if parts is None or parts.scheme not in ("http", "https") or parts.hostname not in _YT_HOSTS:
         raise HTTPException(status_code=400, detail="URL harus berupa link YouTube yang valid")
 
-    # Heuristic demo moments
-    moments = [
-        DetectedMoment(start_sec=5, end_sec=12, label="Intro punch", confidence=0.91),
-        DetectedMoment(start_sec=35, end_sec=48, label="Key point", confidence=0.88),
-        DetectedMoment(start_sec=120, end_sec=136, label="Best moment", confidence=0.93),
-    ]
+    # Mongo stores milliseconds, so truncate to get back what we return
+    now = datetime.now(timezone.utc)
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
 
-    job = VideoJob(
-        youtube_url=req.youtube_url,
+    # The job is built server-side from known-good values, so skip model
+    # validation (the request itself is still validated)
+    job = VideoJob.model_construct(
+        youtube_url=url,
         title=None,
         author=None,
         thumbnail_url=None,
         status="analyzed",
-        detected_moments=moments,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+        detected_moments=_DEMO_MOMENTS,
+        created_at=now,
+        updated_at=now,
     )
+    # Dump straight to JSON-ready values in pydantic-core; create_document
+    # stores the same `now` as real datetimes on its copy
+    job_data = job.model_dump(mode="json", exclude={"detected_moments"}, warnings=False)
+    job_data["detected_moments"] = _DEMO_MOMENTS_DUMP
 
-    job_id = create_document("videojob", job)
+    job_id = await create_document("videojob", job_data, now=now)
+    await cache_incr(JOB_LIST_VERSION_KEY)
 
-    # Return with id field that matches response model
-    return {**job.model_dump(), "id": job_id}
+    # Return with id field that matches response model; returning the
+    # response directly skips FastAPI's response_model re-validation
+    return ORJSONResponse({**job_data, "id": job_id})
+
+# Fields exposed by VideoJobOut; everything else stays in Mongo
+_JOB_LIST_FIELDS = {
+    "youtube_url": 1,
+    "title": 1,
+    "author": 1,
+    "thumbnail_url": 1,
+    "status": 1,
+    "detected_moments": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+def _job_out(d: dict) -> VideoJobOut:
+    # Documents come from our own collection and were validated on insert,
+    # so build the response model without re-running validation.
+    moments = [DetectedMoment.model_construct(**m) for m in d.get("detected_moments") or []]
+    return VideoJobOut.model_construct(**{**d, "detected_moments": moments})
 
 @app.get("/api/jobs", response_model=List[VideoJobOut])
-def list_jobs(limit: int = 20):
-    docs = get_documents("videojob", {}, limit)
-    norm: List[dict] = []
-    for d in docs:
-        # Convert ObjectId to string and expose as id
-        _id = d.get("_id")
-        if isinstance(_id, ObjectId):
-            d["id"] = str(_id)
-        elif _id is not None:
-            d["id"] = str(_id)
-        # Remove raw _id to keep output clean (response_model filters anyway)
-        d.pop("_id", None)
-        norm.append(d)
-    return norm
+async def list_jobs(limit: int = Query(20, ge=1, le=100)):
+    version = await cache_get(JOB_LIST_VERSION_KEY)
+    cache_key = f"jobs:list:v{int(version or 0)}:{limit}"
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
 
-@app.get("/api/jobs/{job_id}", response_model=VideoJobOut)
-def get_job(job_id: str):
+    cursor = find_documents("videojob", {}, limit, projection=_JOB_LIST_FIELDS, sort=[("created_at", -1)])
+    # Pull the first batch before the 200 goes out, so connection and query
+    # errors still surface as a 500 instead of a truncated body
     try:
-        doc = db["videojob"].find_one({"_id": ObjectId(job_id)})
-        if not doc:
-            raise HTTPException(status_code=404, detail="Job tidak ditemukan")
-        doc["id"] = str(doc.pop("_id"))
-        return doc
-    except HTTPException:
-        raise
-    except Exception:
+        first = await cursor.next()
+    except StopAsyncIteration:
+        await cache_set(cache_key, b"[]", JOB_LIST_CACHE_TTL)
+        return Response(content=b"[]", media_type="application/json")
+
+    def encode(d: dict) -> bytes:
+        # Expose the ObjectId as a string id (projection limits the other fields)
+        d["id"] = str(d.pop("_id"))
+        return orjson.dumps(d, option=orjson.OPT_UTC_Z)
+
+    # Chunks are only kept when there is a cache to fill
+    chunks = [] if redis_client is not None else None
+
+    async def stream():
+        # Encode each document as it arrives instead of building a list
+        chunk = b"[" + encode(first)
+        if chunks is not None:
+            chunks.append(chunk)
+        yield chunk
+        async for d in cursor:
+            chunk = b"," + encode(d)
+            if chunks is not None:
+                chunks.append(chunk)
+            yield chunk
+        if chunks is not None:
+            chunks.append(b"]")
+        yield b"]"
+
+    async def fill_cache():
+        # Runs after the body is sent; only cache a stream that completed
+        if chunks and chunks[-1] == b"]":
+            await cache_set(cache_key, b"".join(chunks), JOB_LIST_CACHE_TTL)
+
+    background = BackgroundTask(fill_cache) if chunks is not None else None
+    return StreamingResponse(stream(), media_type="application/json", background=background)
+
+@app.get("/api/jobs/{job_id}", response_model=VideoJobOut)
+async def get_job(job_id: str):
+    if not ObjectId.is_valid(job_id):
         raise HTTPException(status_code=400, detail="ID tidak valid")
 
+    cache_key = f"job:{job_id}"
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    doc = await db["videojob"].find_one({"_id": ObjectId(job_id)})
+    if not doc:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    doc["id"] = str(doc.pop("_id"))
+    body = orjson.dumps(_job_out(doc).model_dump(warnings=False), option=orjson.OPT_UTC_Z)
+    await cache_set(cache_key, body, JOB_CACHE_TTL)
+    return Response(content=body, media_type="application/json")
+
+@functools.lru_cache(maxsize=1024)
+def _preview_url(start: int, end: int) -> str:
+    return f"https://placehold.co/1280x720?text=Clip+{start}-{end}s"
+
 @app.post("/api/clip", response_model=ClipResult)
-def create_clip(req: ClipRequest):
+async def create_clip(req: ClipRequest):
     # Validate job exists
-    try:
-        _ = db["videojob"].find_one({"_id": ObjectId(req.job_id)})
-    except Exception:
+    if not ObjectId.is_valid(req.job_id):
         raise HTTPException(status_code=400, detail="Job ID tidak valid")
+    _ = await db["videojob"].find_one({"_id": ObjectId(req.job_id)})
 
     if req.end_sec <= req.start_sec:
         raise HTTPException(status_code=400, detail="end_sec harus lebih besar dari start_sec")
 
     # Fake render: produce a mock preview URL and return overlays configuration
-    preview_url = f"https://placehold.co/1280x720?text=Clip+{req.start_sec:.0f}-{req.end_sec:.0f}s"
-    result = ClipResult(
+    preview_url = _preview_url(round(req.start_sec), round(req.end_sec))
+    result = ClipResultOut(
         job_id=req.job_id,
         preview_url=preview_url,
         start_sec=req.start_sec,
         end_sec=req.end_sec,
-        overlays=req.overlays,
+        overlays=[OverlayTextOut(o.content, o.position, o.style) for o in req.overlays],
         animation=req.animation,
         emoji=req.emoji,
         created_at=datetime.now(timezone.utc)
     )
-    return result
+    return Response(content=msgspec.json.encode(result), media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WEB_CONCURRENCY", max(2, os.cpu_count() or 1)))
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
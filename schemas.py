@@ -11,7 +11,8 @@ Model name is converted to lowercase for the collection name:
 - BlogPost -> "blogs" collection
 """
 
-from pydantic import BaseModel, Field, HttpUrl
+import msgspec
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 from typing import Optional, List, Literal
 from datetime import datetime
 
@@ -42,6 +43,8 @@ class Product(BaseModel):
 # Video AI Clipper app schemas
 
 class DetectedMoment(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     start_sec: float = Field(..., ge=0, description="Start time in seconds")
     end_sec: float = Field(..., ge=0, description="End time in seconds")
     label: str = Field(..., description="Short label for the moment")
@@ -61,6 +64,8 @@ class VideoJobOut(VideoJob):
     id: str = Field(..., description="Document ID as string")
 
 class OverlayText(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     content: str
     position: Literal["top", "center", "bottom"] = "bottom"
     style: Literal["caption", "title", "subtitle", "emoji"] = "caption"
@@ -82,3 +87,21 @@ class ClipResult(BaseModel):
     animation: str
     emoji: Optional[str] = None
     created_at: Optional[datetime] = None
+
+# Output-only clip structs: built from already validated requests and
+# encoded with msgspec, so they carry no validation of their own.
+
+class OverlayTextOut(msgspec.Struct):
+    content: str
+    position: str
+    style: str
+
+class ClipResultOut(msgspec.Struct, kw_only=True):
+    job_id: str
+    preview_url: Optional[str] = None
+    start_sec: float
+    end_sec: float
+    overlays: List[OverlayTextOut] = []
+    animation: str
+    emoji: Optional[str] = None
+    created_at: Optional[datetime] = None